@@ -1,46 +1,76 @@
 import networkx as nx
 import numpy as np
-from .analysis import analyze_symmetry, classify_style
+from .analysis import analyze_symmetry, classify_style, complexity_value
+
+# Position descriptions indexed by [vertical band][horizontal band]
+AREA_NAMES = (
+    ("the top-left area", "the top area", "the top-right area"),
+    ("the left area", "the center area", "the right area"),
+    ("the bottom-left area", "the bottom area", "the bottom-right area"),
+)
+
+def reconstruct_graph(graph_data):
+    nodes = graph_data['nodes']
+    # Node coordinates live in one contiguous (N, 2) float32 array on the graph;
+    # each node's 'o' attribute is a row view into it.
+    node_ids = [node['id'] for node in nodes]
+    node_xy = np.array([node['attr']['o'] for node in nodes], dtype=np.float32).reshape(len(nodes), 2)
+    G = nx.Graph(node_ids=node_ids, node_xy=node_xy, node_index={n: i for i, n in enumerate(node_ids)})
+    for i, n in enumerate(node_ids):
+        G.add_node(n, o=node_xy[i])
+    for edge in graph_data['edges']:
+        G.add_edge(edge['source'], edge['target'], pts=np.array(edge['attr']['pts']))
+    # Point count per (deduplicated) edge, used to tell curves from straight lines
+    G.graph['edge_pts_len'] = np.fromiter(
+        (len(pts) for _, _, pts in G.edges(data='pts', default=())), dtype=np.int32, count=G.number_of_edges()
+    )
+    return G
 
 class TutorialAgent:
     """Generates human-friendly drawing tutorials from a Kolam graph."""
 
-    def __init__(self, analysis_data):
-        self.graph = self.reconstruct_graph(analysis_data['graph'])
+    def __init__(self, analysis_data, graph=None):
+        # Callers running several agents on one payload pass the graph they built
+        self.graph = reconstruct_graph(analysis_data['graph']) if graph is None else graph
         self.dots = analysis_data['dots']
         self.image_size = analysis_data['image_size']
+        self._drawing_path = None
 
-    def reconstruct_graph(self, graph_data):
-        G = nx.Graph()
-        for node in graph_data['nodes']:
-            G.add_node(node['id'], o=np.array(node['attr']['o']))
-        for edge in graph_data['edges']:
-            G.add_edge(edge['source'], edge['target'], pts=np.array(edge['attr']['pts']))
-        return G
+    def _area_codes(self, coords):
+        """Maps (x, y) coordinates to row/column indices into AREA_NAMES."""
+        width, height = self.image_size[0], self.image_size[1]
+        center_x, center_y = width / 2, height / 2
+        x, y = coords[:, 0], coords[:, 1]
+        y_code = np.where(y < center_y - height / 4, 0, np.where(y > center_y + height / 4, 2, 1))
+        x_code = np.where(x < center_x - width / 4, 0, np.where(x > center_x + width / 4, 2, 1))
+        return y_code, x_code
 
     def get_dot_description(self, dot_coords):
-        center_x, center_y = self.image_size[0] / 2, self.image_size[1] / 2
-        x, y = dot_coords
-        y_pos = "middle"
-        if y < center_y - self.image_size[1] / 4: y_pos = "top"
-        elif y > center_y + self.image_size[1] / 4: y_pos = "bottom"
-        x_pos = "center"
-        if x < center_x - self.image_size[0] / 4: x_pos = "left"
-        elif x > center_x + self.image_size[0] / 4: x_pos = "right"
-        if y_pos != "middle" and x_pos != "center": return f"the {y_pos}-{x_pos} area"
-        elif y_pos != "middle": return f"the {y_pos} area"
-        else: return f"the {x_pos} area"
+        y_code, x_code = self._area_codes(np.asarray(dot_coords, dtype=float).reshape(1, 2))
+        return AREA_NAMES[y_code[0]][x_code[0]]
+
+    def describe_nodes(self):
+        """Describes the position of every graph node in a single vectorized pass."""
+        y_code, x_code = self._area_codes(self.graph.graph['node_xy'])
+        return {n: AREA_NAMES[yc][xc] for n, yc, xc in zip(self.graph.graph['node_ids'], y_code.tolist(), x_code.tolist())}
+
+    def get_drawing_path(self):
+        """Returns the start node (topmost dot) and the DFS edge order, computed once."""
+        if self._drawing_path is None:
+            start_idx = int(np.argmin(self.graph.graph['node_xy'][:, 1]))
+            start_node = self.graph.graph['node_ids'][start_idx]
+            self._drawing_path = (start_node, list(nx.dfs_edges(self.graph, source=start_node)))
+        return self._drawing_path
 
     def generate_drawing_steps(self):
         if not self.graph.nodes: return ["Start by placing the dots on your paper."] + [f"Place a dot at position ({d[0]}, {d[1]})" for d in self.dots]
         steps = ["1. First, place all the dots on your paper to form the grid."]
-        start_node = min(self.graph.nodes, key=lambda n: self.graph.nodes[n]['o'][1])
-        path_edges = list(nx.dfs_edges(self.graph, source=start_node))
+        start_node, path_edges = self.get_drawing_path()
         if not path_edges: return steps + ["The design consists only of dots."]
-        current_pos_desc = self.get_dot_description(self.graph.nodes[start_node]['o'])
-        steps.append(f"2. Begin with the dot in {current_pos_desc}.")
+        descriptions = self.describe_nodes()
+        steps.append(f"2. Begin with the dot in {descriptions[start_node]}.")
         for i, (u, v) in enumerate(path_edges):
-            start_desc, end_desc = self.get_dot_description(self.graph.nodes[u]['o']), self.get_dot_description(self.graph.nodes[v]['o'])
+            start_desc, end_desc = descriptions[u], descriptions[v]
             path = self.graph.edges[u, v].get('pts', [])
             instruction = f"{i+3}. From the dot in {start_desc}, draw a curve towards the dot in {end_desc}." if len(path) > 2 else f"{i+3}. Now, draw a straight line to the one in {end_desc}."
             steps.append(instruction)
@@ -49,16 +79,17 @@ class TutorialAgent:
 
 class CulturalAgent:
     """Analyzes the cultural and artistic properties of a Rangoli."""
-    def __init__(self, analysis_data):
+    def __init__(self, analysis_data, graph=None):
         self.analysis_data = analysis_data
-        self.graph = TutorialAgent(analysis_data).graph
+        self.graph = reconstruct_graph(analysis_data['graph']) if graph is None else graph
 
     def analyze(self):
-        num_dots, num_lines, num_curves = len(self.analysis_data['dots']), self.graph.number_of_edges(), sum(1 for _, _, data in self.graph.edges(data=True) if len(data.get('pts', [])) > 2)
+        edge_pts_len = self.graph.graph['edge_pts_len']
+        num_dots, num_lines, num_curves = len(self.analysis_data['dots']), len(edge_pts_len), int((edge_pts_len > 2).sum())
         complexity = (num_dots * 0.2) + (num_lines * 0.5) + (num_curves * 0.8)
         complexity_level = "Simple" if complexity <= 20 else ("Moderate" if complexity <= 50 else "Complex")
         report = {
-            "metadata": {"dots": num_dots, "lines": num_lines - num_curves, "curves": num_curves, "complexity": f"{complexity:.2f} ({complexity_level})"},
+            "metadata": {"dots": num_dots, "lines": num_lines - num_curves, "curves": num_curves, "complexity": f"{complexity:.2f} ({complexity_level})", "complexity_value": round(complexity, 2)},
             "cultural_context": {"origin_state": "Unknown", "category": "Unknown", "description": "..."}
         }
         report["artistic_properties"] = {"symmetry": analyze_symmetry(self.analysis_data['dots'], self.graph, self.analysis_data['image_size']), "style": classify_style(report)}
@@ -71,16 +102,17 @@ class SuggestionAgent:
 
     def generate_suggestions(self):
         suggestions = []
-        complexity = float(self.report["metadata"]["complexity"].split(' ')[0])
-        style = self.report["artistic_properties"]["style"]
+        complexity = complexity_value(self.report["metadata"])
+        artistic_properties = self.report["artistic_properties"]
+        style, symmetry = artistic_properties["style"], artistic_properties["symmetry"]
 
         if complexity < 15:
             suggestions.append("This is a lovely start! Try adding more intricate loops or lines to increase the complexity.")
         if "Geometric" in style:
             suggestions.append("The geometric patterns are very strong. Consider adding some curved elements for a beautiful contrast.")
-        if self.report["artistic_properties"]["symmetry"]["vertical"] < 0.8:
+        if symmetry["vertical"] < 0.8:
             suggestions.append("Explore vertical symmetry to create a more balanced and harmonious design.")
-        if self.report["artistic_properties"]["symmetry"]["horizontal"] < 0.8:
+        if symmetry["horizontal"] < 0.8:
             suggestions.append("Explore horizontal symmetry to create a more balanced and harmonious design.")
         if not suggestions:
             suggestions.append("This is a well-balanced and beautiful design! Experiment with different color palettes to make it even more vibrant.")
@@ -1,4 +1,22 @@
 import numpy as np
+from scipy.spatial import cKDTree
+
+# Below this many dots a brute-force squared-distance scan fits in cache and beats
+# the cost of building and querying a k-d tree.
+BRUTE_FORCE_MAX_DOTS = 256
+
+def _count_reflected_matches(dot_array, reflected, tree=None, tolerance=10.0):
+    """Counts reflected dots that land within `tolerance` pixels of an original dot.
+
+    `tree` is a k-d tree over `dot_array` shared by both reflections, or None to
+    use the brute-force scan for small inputs.
+    """
+    if tree is None:
+        dx = reflected[:, 0, None] - dot_array[None, :, 0]
+        dy = reflected[:, 1, None] - dot_array[None, :, 1]
+        return int(((dx * dx + dy * dy).min(axis=1) < tolerance * tolerance).sum())
+    distances, _ = tree.query(reflected, k=1, distance_upper_bound=tolerance)
+    return int(np.isfinite(distances).sum())
 
 def analyze_symmetry(dots, graph, image_size):
     """Analyzes the symmetry of the Rangoli design."""
@@ -6,38 +24,33 @@ def analyze_symmetry(dots, graph, image_size):
         return {"horizontal": 0, "vertical": 0}
 
     center_x, center_y = image_size[0] / 2, image_size[1] / 2
-    dot_array = np.array(dots)
+    dot_array = np.asarray(dots, dtype=np.float32)
+    tree = cKDTree(dot_array) if len(dot_array) > BRUTE_FORCE_MAX_DOTS else None
 
     # Vertical Symmetry (reflection across y-axis)
-    reflected_dots_x = 2 * center_x - dot_array[:, 0]
-    v_matches = 0
-    for i, dot in enumerate(dot_array):
-        reflected_dot_x = 2 * center_x - dot[0]
-        # Find the closest dot in the original set to the reflected position
-        distances = np.sqrt((reflected_dot_x - dot_array[:, 0])**2 + (dot[1] - dot_array[:, 1])**2)
-        if np.min(distances) < 10:  # Allow a 10-pixel tolerance
-            v_matches += 1
-    vertical_symmetry_score = v_matches / len(dots)
+    reflected_v = np.column_stack([2 * center_x - dot_array[:, 0], dot_array[:, 1]])
+    vertical_symmetry_score = _count_reflected_matches(dot_array, reflected_v, tree) / len(dots)
 
     # Horizontal Symmetry (reflection across x-axis)
-    reflected_dots_y = 2 * center_y - dot_array[:, 1]
-    h_matches = 0
-    for i, dot in enumerate(dot_array):
-        reflected_dot_y = 2 * center_y - dot[1]
-        distances = np.sqrt((dot[0] - dot_array[:, 0])**2 + (reflected_dot_y - dot_array[:, 1])**2)
-        if np.min(distances) < 10: # Allow a 10-pixel tolerance
-            h_matches += 1
-    horizontal_symmetry_score = h_matches / len(dots)
+    reflected_h = np.column_stack([dot_array[:, 0], 2 * center_y - dot_array[:, 1]])
+    horizontal_symmetry_score = _count_reflected_matches(dot_array, reflected_h, tree) / len(dots)
 
     return {
         "horizontal": round(horizontal_symmetry_score, 2),
         "vertical": round(vertical_symmetry_score, 2)
     }
 
+def complexity_value(metadata):
+    """Numeric complexity of a report, parsed from the "x.xx (level)" label for older reports."""
+    value = metadata.get('complexity_value')
+    if value is None:
+        value = float(str(metadata['complexity']).split()[0])
+    return value
+
 def classify_style(analysis_report):
     """Simulates a style classification model based on design features."""
     metadata = analysis_report['metadata']
-    complexity = float(metadata['complexity'].split(' ')[0])
+    complexity = complexity_value(metadata)
     lines = metadata['lines']
     curves = metadata['curves']
 
@@ -1,3 +1,9 @@
+import gzip
+import hashlib
+from types import MappingProxyType
+
+import orjson
+
 heritage_data = [
   {
     'state': 'Andhra Pradesh',
@@ -366,4 +372,33 @@ heritage_data = [
         },
     },
 },
-]
\ No newline at end of file
+]
+
+POPULARITY_CATEGORIES = ('modern', 'fusion', 'creative', 'ethnic')
+
+def _parse_popularity(value):
+    return int(value.rstrip('%')) if value.endswith('%') else None
+
+# Parse the "75%" display strings once: each category also carries the integer
+# percentage as 'popularity_pct' (None, i.e. JSON null, for "N/A") so consumers
+# never re-parse
+for entry in heritage_data:
+    for category in POPULARITY_CATEGORIES:
+        details = entry['categories'][category]
+        details['popularity_pct'] = _parse_popularity(details['popularity'])
+
+# Serialized once at import; the /heritage endpoint serves these bytes directly
+HERITAGE_JSON = orjson.dumps(heritage_data)
+HERITAGE_ETAG = '"' + hashlib.blake2b(HERITAGE_JSON, digest_size=16).hexdigest() + '"'
+# ...and compressed once too, for clients that accept gzip
+HERITAGE_JSON_GZIP = gzip.compress(HERITAGE_JSON, compresslevel=9, mtime=0)
+
+
+# Freeze the records so nothing can mutate them out from under the cached JSON
+# bytes above; the module's pages also stay clean when workers fork.
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+heritage_data = tuple(_freeze(entry) for entry in heritage_data)
@@ -1,41 +1,52 @@
 from fastapi import UploadFile, File
 import numpy as np
 import cv2
-from skimage.morphology import skeletonize
 import torch
 from torchvision.transforms import functional as F
-from .models import DotGridDetector, StrokeSegmenter
+from .models import KolamMultiHead
 import sknw
+import threading
 
-# Load models
-dot_detector = DotGridDetector()
-stroke_segmenter = StrokeSegmenter()
-dot_detector.eval()
-stroke_segmenter.eval()
+# Run on the GPU when one is available, in half precision
+device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+use_fp16 = device.type == 'cuda'
+
+# The model is built on first use (or by the API startup hook), not at import
+_model = None
+_model_lock = threading.Lock()
+
+def load_models():
+    """Builds the shared-backbone dot/stroke model once and returns it."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            model = KolamMultiHead().to(device)
+            model.eval()
+            _model = model
+    return _model
 
 def process_image(img: np.ndarray):
     """Processes an image to extract dot grid and stroke graph."""
+    model = load_models()
+
     # Convert to tensor
     input_tensor = F.to_tensor(img).unsqueeze(0)
+    if device.type == 'cuda':
+        input_tensor = input_tensor.pin_memory().to(device, non_blocking=True)
+
+    # Perform inference: one backbone pass yields both predictions
+    with torch.inference_mode(), torch.autocast(device_type=device.type, dtype=torch.float16, enabled=use_fp16):
+        dot_grid_pred, stroke_seg_pred = model(input_tensor)
 
-    # Perform inference
-    with torch.no_grad():
-        dot_grid_pred = dot_detector(input_tensor)
-        stroke_seg_pred = stroke_segmenter(input_tensor)
-
-    # Post-process predictions
-    dot_grid_mask = (dot_grid_pred.squeeze().numpy() > 0.5).astype(np.uint8)
-    stroke_mask = (torch.sigmoid(stroke_seg_pred).squeeze().numpy() > 0.5).astype(np.uint8)
-
-    # Find dot coordinates
-    contours, _ = cv2.findContours(dot_grid_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    dots = []
-    for cnt in contours:
-        M = cv2.moments(cnt)
-        if M["m00"] != 0:
-            cX = int(M["m10"] / M["m00"])
-            cY = int(M["m01"] / M["m00"])
-            dots.append([cX, cY])
+    # Threshold on the device and copy back only the uint8 masks; the stroke
+    # segmenter emits logits, and sigmoid(x) > 0.5 exactly when x > 0
+    dot_grid_mask = (dot_grid_pred.squeeze() > 0.5).to(torch.uint8).cpu().numpy()
+    stroke_mask = (stroke_seg_pred.squeeze() > 0).to(torch.uint8).cpu().numpy()
+
+    # Find dot coordinates: centroids of all connected blobs in one pass, skipping
+    # the background label and single-pixel specks (zero-area contours before)
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(dot_grid_mask, connectivity=8, ltype=cv2.CV_32S)
+    dots = centroids[1:][stats[1:, cv2.CC_STAT_AREA] > 1].astype(np.int32).tolist()
 
     # Build graph from skeleton
     graph = build_graph_from_skeleton(stroke_mask)
@@ -50,14 +61,17 @@ def process_image(img: np.ndarray):
     }
 
 def build_graph_from_skeleton(stroke_mask):
-    skeleton = skeletonize(stroke_mask // 255)
+    # stroke_mask holds 0/1; OpenCV's Zhang-Suen thinning expects 0/255
+    skeleton = cv2.ximgproc.thinning(stroke_mask * 255, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN) > 0
     graph = sknw.build_sknw(skeleton)
     return graph
 
+def _attrs_to_lists(data):
+    # sknw stores coordinates ('o', 'pts') as ndarrays; convert each in one C call
+    return {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in data.items()}
+
 def nx_to_serializable(graph):
-    serializable_graph = {"nodes": [], "edges": []}
-    for node, data in graph.nodes(data=True):
-        serializable_graph["nodes"].append({"id": node, "attr": data})
-    for u, v, data in graph.edges(data=True):
-        serializable_graph["edges"].append({"source": u, "target": v, "attr": data})
-    return serializable_graph
\ No newline at end of file
+    return {
+        "nodes": [{"id": node, "attr": _attrs_to_lists(data)} for node, data in graph.nodes(data=True)],
+        "edges": [{"source": u, "target": v, "attr": _attrs_to_lists(data)} for u, v, data in graph.edges(data=True)]
+    }
\ No newline at end of file
@@ -1,43 +1,85 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
 try:
-    from .image_processing import process_image
-    from .agents import TutorialAgent, CulturalAgent, SuggestionAgent
+    from .image_processing import load_models, process_image
+    from .agents import TutorialAgent, CulturalAgent, SuggestionAgent, reconstruct_graph
     from .kolam_design_principles import KolamDesignPrinciples
     from .kolam_recreator import KolamRecreator, generate_traditional_patterns
-    from .heritage_data import heritage_data
-    from .new_analysis import generate_analysis_report_stream
+    from .heritage_data import HERITAGE_ETAG, HERITAGE_JSON, HERITAGE_JSON_GZIP
+    from .new_analysis import generate_analysis_report_stream, throttle_progress
 except ImportError:
     # Handle when running as script (not as package)
-    from image_processing import process_image
-    from agents import TutorialAgent, CulturalAgent, SuggestionAgent
+    from image_processing import load_models, process_image
+    from agents import TutorialAgent, CulturalAgent, SuggestionAgent, reconstruct_graph
     from kolam_design_principles import KolamDesignPrinciples
     from kolam_recreator import KolamRecreator, generate_traditional_patterns
-    from heritage_data import heritage_data
-    from new_analysis import generate_analysis_report_stream
+    from heritage_data import HERITAGE_ETAG, HERITAGE_JSON, HERITAGE_JSON_GZIP
+    from new_analysis import generate_analysis_report_stream, throttle_progress
 
+import asyncio
 import numpy as np
 import cv2
-import json
+import orjson
 import tempfile
+import threading
 import base64
+import functools
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
-class NumpyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super(NumpyEncoder, self).default(obj)
-
 from new_analysis import generate_analysis_report_stream
 import os
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# LRU memo of analysis results keyed by (kind, digest of the uploaded bytes), so
+# re-uploads of the same image skip decoding and analysis entirely
+ANALYSIS_CACHE_SIZE = 128
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+def _decode_image(contents: bytes) -> np.ndarray:
+    return cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+
+def _cached_analysis(kind: str, contents: bytes, compute):
+    key = (kind, hashlib.blake2b(contents, digest_size=16).digest())
+    with _analysis_cache_lock:
+        if key in _analysis_cache:
+            _analysis_cache.move_to_end(key)
+            return _analysis_cache[key]
+    result = compute(contents)
+    with _analysis_cache_lock:
+        _analysis_cache[key] = result
+        if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return result
+
+def _analyze_image(contents: bytes) -> dict:
+    analysis_data = process_image(_decode_image(contents))
+    # Both agents work on the same stroke graph, so it is rebuilt only once
+    graph = reconstruct_graph(analysis_data['graph'])
+    tutorial = TutorialAgent(analysis_data, graph).generate_drawing_steps()
+    insights = CulturalAgent(analysis_data, graph).analyze()
+    return {"drawing_data": analysis_data, "tutorial": tutorial, "insights": insights}
+
+def _analyze_design_principles(contents: bytes) -> dict:
+    return KolamDesignPrinciples(image_array=_decode_image(contents)).generate_comprehensive_analysis()
+
+class NumpyJSONResponse(Response):
+    """JSON response rendered by orjson, which serializes NumPy arrays and scalars natively."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+app = FastAPI(default_response_class=NumpyJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,23 +88,64 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress the (highly repetitive) JSON responses; bodies that are already
+# encoded, like the pre-gzipped /heritage payload, pass through untouched
+# (Starlette >= 0.22 skips responses that set Content-Encoding)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Fast DEFLATE level: the synthetic designs compress well even at level 1
+PNG_ENCODE_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+
+def _encode_png(image: np.ndarray) -> bytes:
+    _, buffer = cv2.imencode('.png', image, PNG_ENCODE_PARAMS)
+    return buffer.tobytes()
+
+@functools.lru_cache(maxsize=1)
+def _traditional_pattern_pngs() -> dict:
+    """Traditional patterns are deterministic, so they are drawn and encoded once."""
+    patterns = generate_traditional_patterns()
+    # libpng releases the GIL, so the patterns encode in parallel
+    with ThreadPoolExecutor() as executor:
+        return dict(zip(patterns, executor.map(_encode_png, patterns.values())))
+
+@functools.lru_cache(maxsize=1)
+def _traditional_patterns_json() -> bytes:
+    """The complete /generate_traditional_patterns response body, serialized once."""
+    return orjson.dumps({
+        "status": "success",
+        "patterns": {
+            name: {
+                "image": base64.b64encode(png).decode('utf-8'),
+                "description": f"Traditional {name.replace('_', ' ').title()} pattern"
+            }
+            for name, png in _traditional_pattern_pngs().items()
+        }
+    })
+
+def _log_warm_up_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Startup warm-up task %s failed", task.get_name(), exc_info=task.exception())
+
+@app.on_event("startup")
+async def warm_up():
+    # Warm the networks and the static pattern payload in the background so the
+    # server starts accepting requests immediately; process_image waits for the
+    # model load if it needs them. The tasks are kept on app.state so they are
+    # not garbage-collected, and failures are logged rather than lost.
+    app.state.model_loader = asyncio.create_task(asyncio.to_thread(load_models), name="model_loader")
+    app.state.pattern_builder = asyncio.create_task(
+        asyncio.to_thread(_traditional_patterns_json), name="pattern_builder"
+    )
+    for task in (app.state.model_loader, app.state.pattern_builder):
+        task.add_done_callback(_log_warm_up_failure)
 
 @app.post("/analyze")
 async def analyze_image(file: UploadFile = File(...)):
     try:
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        analysis_data = process_image(img)
-        
-        tutorial_agent = TutorialAgent(analysis_data)
-        tutorial = tutorial_agent.generate_drawing_steps()
-        
-        cultural_agent = CulturalAgent(analysis_data)
-        insights = cultural_agent.analyze()
-        
-        return {"drawing_data": analysis_data, "tutorial": tutorial, "insights": insights}
+        # Off the event loop: inference, and the model load it may wait on
+        analysis = await asyncio.to_thread(_cached_analysis, "analyze", contents, _analyze_image)
+        return NumpyJSONResponse(analysis)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -72,15 +155,39 @@ import traceback
 async def new_analyze_image(file: UploadFile = File(...)):
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
-            tmp.write(await file.read())
+            # Copy the upload in chunks rather than buffering it whole in memory
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
             file_path = tmp.name
 
         async def event_stream():
+            # Advance the report generator on a worker thread so each analysis
+            # stage runs off the event loop while progress events stream out.
+            report_stream = throttle_progress(generate_analysis_report_stream(file_path))
+            # Held while the generator runs, so it is never closed mid-step
+            stream_lock = threading.Lock()
+
+            def advance():
+                with stream_lock:
+                    return next(report_stream, None)
+
+            def cleanup():
+                try:
+                    with stream_lock:
+                        report_stream.close()
+                finally:
+                    os.remove(file_path)
+
             try:
-                for result in generate_analysis_report_stream(file_path):
-                    yield f"data: {json.dumps(result, cls=NumpyEncoder)}\n\n"
+                while (result := await asyncio.to_thread(advance)) is not None:
+                    yield b"data: " + orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) + b"\n\n"
             finally:
-                os.remove(file_path)
+                # On a client disconnect the current step may still be running on
+                # its worker thread; the cleanup then waits for it off the event loop
+                if stream_lock.locked():
+                    threading.Thread(target=cleanup, daemon=True).start()
+                else:
+                    cleanup()
         
         return StreamingResponse(event_stream(), media_type="text/event-stream")
     except Exception as e:
@@ -92,13 +199,41 @@ async def get_suggestions(analysis_report: dict):
     try:
         suggestion_agent = SuggestionAgent(analysis_report)
         suggestions = suggestion_agent.generate_suggestions()
-        return {"suggestions": suggestions}
+        return NumpyJSONResponse({"suggestions": suggestions})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _prefers_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header ranks gzip at least as high as identity."""
+    qvalues = {}
+    for coding in accept_encoding.split(","):
+        name, *params = (part.strip() for part in coding.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[name.lower()] = q
+    wildcard = qvalues.get("*")
+    gzip_q = qvalues.get("gzip", qvalues.get("x-gzip", wildcard or 0.0))
+    # identity stays acceptable unless excluded explicitly or through "*;q=0"
+    identity_q = qvalues.get("identity", 1.0 if wildcard is None else wildcard)
+    return gzip_q > 0 and gzip_q >= identity_q
+
 @app.get("/heritage")
-async def get_heritage_data():
-    return heritage_data
+async def get_heritage_data(request: Request):
+    if request.headers.get("if-none-match") == HERITAGE_ETAG:
+        return Response(status_code=304, headers={"ETag": HERITAGE_ETAG})
+    headers = {"ETag": HERITAGE_ETAG, "Vary": "Accept-Encoding"}
+    if _prefers_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=HERITAGE_JSON_GZIP, media_type="application/json", headers=headers)
+    return Response(content=HERITAGE_JSON, media_type="application/json", headers=headers)
 
 @app.post("/analyze_design_principles")
 async def analyze_design_principles(file: UploadFile = File(...)):
@@ -107,16 +242,14 @@ async def analyze_design_principles(file: UploadFile = File(...)):
     """
     try:
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
-        # Initialize the design principles analyzer
-        analyzer = KolamDesignPrinciples(image_array=img)
+        # Generate comprehensive analysis (shared with /compare_designs uploads),
+        # off the event loop like every other caller of the cache
+        analysis = await asyncio.to_thread(
+            _cached_analysis, "design_principles", contents, _analyze_design_principles
+        )
         
-        # Generate comprehensive analysis
-        analysis = analyzer.generate_comprehensive_analysis()
-        
-        return {
+        return NumpyJSONResponse({
             "status": "success",
             "analysis": analysis,
             "design_principles": {
@@ -131,14 +264,17 @@ async def analyze_design_principles(file: UploadFile = File(...)):
                 },
                 "summary": analysis.get('summary', {})
             }
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 @app.post("/recreate_kolam")
-async def recreate_kolam(request: dict):
+async def recreate_kolam(request: dict, format: str = "json"):
     """
     Recreate a Kolam design based on provided parameters or analysis.
+    
+    With ?format=raw the PNG bytes are returned directly, with the design
+    properties in X-Kolam-* headers, instead of base64 inside JSON.
     """
     try:
         recreator = KolamRecreator(width=600, height=600)
@@ -155,13 +291,17 @@ async def recreate_kolam(request: dict):
             # Generate random pattern
             design = recreator.generate_simple_kolam("random")
         
-        # Convert to base64 for JSON response
-        _, buffer = cv2.imencode('.png', design)
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
+        png = _encode_png(design)
+        if format == "raw":
+            return Response(content=png, media_type="image/png", headers={
+                "X-Kolam-Width": str(design.shape[1]),
+                "X-Kolam-Height": str(design.shape[0]),
+                "X-Kolam-Pattern-Type": request.get("pattern_type", "custom")
+            })
         
         return {
             "status": "success",
-            "design_image": img_base64,
+            "design_image": base64.b64encode(png).decode('utf-8'),
             "design_properties": {
                 "width": design.shape[1],
                 "height": design.shape[0],
@@ -177,25 +317,20 @@ async def get_traditional_patterns():
     Generate a collection of traditional Kolam patterns.
     """
     try:
-        patterns = generate_traditional_patterns()
-        
-        # Convert patterns to base64
-        pattern_data = {}
-        for name, pattern in patterns.items():
-            _, buffer = cv2.imencode('.png', pattern)
-            img_base64 = base64.b64encode(buffer).decode('utf-8')
-            pattern_data[name] = {
-                "image": img_base64,
-                "description": f"Traditional {name.replace('_', ' ').title()} pattern"
-            }
-        
-        return {
-            "status": "success",
-            "patterns": pattern_data
-        }
+        return Response(content=await asyncio.to_thread(_traditional_patterns_json), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pattern generation failed: {str(e)}")
 
+@app.get("/patterns/{name}.png")
+async def get_traditional_pattern_png(name: str):
+    """
+    Serve a single traditional Kolam pattern as a PNG image.
+    """
+    pngs = _traditional_pattern_pngs()
+    if name not in pngs:
+        raise HTTPException(status_code=404, detail=f"Unknown pattern: {name}")
+    return Response(content=pngs[name], media_type="image/png")
+
 @app.post("/compare_designs")
 async def compare_designs(file1: UploadFile = File(...), file2: UploadFile = File(...)):
     """
@@ -203,21 +338,19 @@ async def compare_designs(file1: UploadFile = File(...), file2: UploadFile = Fil
     """
     try:
         # Read both images
-        contents1 = await file1.read()
-        contents2 = await file2.read()
-        
-        nparr1 = np.frombuffer(contents1, np.uint8)
-        nparr2 = np.frombuffer(contents2, np.uint8)
+        contents1, contents2 = await asyncio.gather(file1.read(), file2.read())
         
-        img1 = cv2.imdecode(nparr1, cv2.IMREAD_COLOR)
-        img2 = cv2.imdecode(nparr2, cv2.IMREAD_COLOR)
-        
-        # Analyze both designs
-        analyzer1 = KolamDesignPrinciples(image_array=img1)
-        analyzer2 = KolamDesignPrinciples(image_array=img2)
-        
-        analysis1 = analyzer1.generate_comprehensive_analysis()
-        analysis2 = analyzer2.generate_comprehensive_analysis()
+        # Analyze both designs concurrently off the event loop (OpenCV and NumPy
+        # release the GIL); an identical pair is only analyzed once
+        if contents1 == contents2:
+            analysis1 = analysis2 = await asyncio.to_thread(
+                _cached_analysis, "design_principles", contents1, _analyze_design_principles
+            )
+        else:
+            analysis1, analysis2 = await asyncio.gather(
+                asyncio.to_thread(_cached_analysis, "design_principles", contents1, _analyze_design_principles),
+                asyncio.to_thread(_cached_analysis, "design_principles", contents2, _analyze_design_principles)
+            )
         
         # Compare design principles
         comparison = {
@@ -227,12 +360,12 @@ async def compare_designs(file1: UploadFile = File(...), file2: UploadFile = Fil
             "cultural_authenticity_comparison": _compare_cultural_authenticity(analysis1, analysis2)
         }
         
-        return {
+        return NumpyJSONResponse({
             "status": "success",
             "design1_analysis": analysis1,
             "design2_analysis": analysis2,
             "comparison": comparison
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
 
@@ -36,4 +36,34 @@ class StrokeSegmenter(nn.Module):
     def forward(self, x):
         if x.shape[1] == 1: # if grayscale
             x = x.repeat(1, 3, 1, 1)
-        return self.model(x)['out']
\ No newline at end of file
+        return self.model(x)['out']
+
+class KolamMultiHead(nn.Module):
+    """Dot grid and stroke predictions from a single shared backbone pass."""
+    def __init__(self, pretrained=True):
+        super(KolamMultiHead, self).__init__()
+        # DeepLabV3's dilated ResNet-50 backbone (output stride 8) feeds both heads
+        deeplab = models.segmentation.deeplabv3_resnet50(pretrained=pretrained, progress=True)
+        self.backbone = deeplab.backbone
+        
+        # Stroke head: the DeepLabV3 classifier, single-class like StrokeSegmenter
+        self.stroke_head = deeplab.classifier
+        self.stroke_head[4] = nn.Conv2d(256, 1, kernel_size=(1, 1), stride=(1, 1))
+        
+        # Dot head: the backbone is already at stride 8, the resolution
+        # DotGridDetector upsamples to, so no transposed convolutions are needed
+        self.dot_head = nn.Sequential(
+            nn.Conv2d(2048, 128, 3, padding=1),
+            nn.ReLU(),
+            nn.Conv2d(128, 1, 1),
+            nn.Sigmoid()  # Output a probability map of dot locations
+        )
+
+    def forward(self, x):
+        if x.shape[1] == 1: # if grayscale
+            x = x.repeat(1, 3, 1, 1)
+        features = self.backbone(x)['out']
+        stroke_logits = nn.functional.interpolate(
+            self.stroke_head(features), size=x.shape[-2:], mode='bilinear', align_corners=False
+        )
+        return self.dot_head(features), stroke_logits
@@ -1,12 +1,20 @@
 import cv2
 import numpy as np
 from skimage.measure import regionprops, label
-from skimage.transform import hough_line, hough_line_peaks
-from scipy.spatial.distance import pdist, squareform
+from scipy.sparse import csr_array
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 import networkx as nx
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import threading
 import time
 import json
 
+# Run edge and line-segment detection on OpenCV's CUDA module when it is built in and a GPU is present
+CUDA_AVAILABLE = hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+
 def analyze_symmetry(gray, thresh):
     """
     Analyzes the symmetry of an image.
@@ -19,24 +27,29 @@ def analyze_symmetry(gray, thresh):
         dict: A dictionary containing the symmetry analysis results.
     """
     
-    # Reflectional symmetry
+    # The image is binary, so pixel agreement is counted on bit-packed copies:
+    # XOR marks the disagreeing pixels and a popcount totals them. Rows are
+    # packed separately, so reversing the packed rows flips the image top to
+    # bottom without materializing the flipped pixels.
     h, w = thresh.shape
-    vertical_flip = cv2.flip(thresh, 1)
-    horizontal_flip = cv2.flip(thresh, 0)
-    
-    vertical_symmetry = np.sum(thresh == vertical_flip) / (h * w)
-    horizontal_symmetry = np.sum(thresh == horizontal_flip) / (h * w)
-    
-    # Rotational symmetry
-    rotational_symmetry = {}
-    for angle in [90, 180, 270]:
-        if angle == 90:
-            rotated = cv2.rotate(thresh, cv2.ROTATE_90_CLOCKWISE)
-        elif angle == 180:
-            rotated = cv2.rotate(thresh, cv2.ROTATE_180)
-        elif angle == 270:
-            rotated = cv2.rotate(thresh, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        rotational_symmetry[angle] = np.sum(thresh == rotated) / (h * w)
+    packed = np.packbits(thresh, axis=1)
+    
+    # The left-right mirror is packed once and reused for the half turn, which
+    # is that mirror flipped top to bottom. A quarter turn cannot map a
+    # non-square canvas onto itself, so those are only compared on squares.
+    mirrored = np.packbits(cv2.flip(thresh, 1), axis=1)
+    transforms = {"vertical": mirrored, "horizontal": packed[::-1], 180: mirrored[::-1]}
+    if h == w:
+        transforms[90] = np.packbits(cv2.rotate(thresh, cv2.ROTATE_90_CLOCKWISE), axis=1)
+        transforms[270] = np.packbits(cv2.rotate(thresh, cv2.ROTATE_90_COUNTERCLOCKWISE), axis=1)
+    
+    # One XOR and popcount reduction over the stacked transforms
+    disagreeing = np.bitwise_count(np.bitwise_xor(np.stack(list(transforms.values())), packed)).sum(axis=(1, 2))
+    agreement = dict(zip(transforms, ((h * w - disagreeing) / (h * w)).tolist()))
+    
+    vertical_symmetry = agreement["vertical"]
+    horizontal_symmetry = agreement["horizontal"]
+    rotational_symmetry = {angle: agreement.get(angle, 0.0) for angle in (90, 180, 270)}
         
     return {
         "reflectional": {
@@ -46,20 +59,28 @@ def analyze_symmetry(gray, thresh):
         "rotational": rotational_symmetry
     }
 
-def analyze_dot_grid(gray, thresh_inv):
+# Longest image side symmetry is measured at; larger inputs are downsampled
+SYMMETRY_MAX_SIDE = 1024
+
+# Neighbours per dot used to estimate the grid orientation
+GRID_NEIGHBORS = 4
+
+def analyze_dot_grid(gray, thresh_inv, contours=None):
     """
     Analyzes the dot grid structure of an image.
     
     Args:
         gray (np.ndarray): The input grayscale image.
         thresh_inv (np.ndarray): The input inverted binary thresholded image.
+        contours (list, optional): Precomputed external contours of thresh_inv.
         
     Returns:
         dict: A dictionary containing the dot grid analysis results.
     """
     
     # Find contours
-    contours, _ = cv2.findContours(thresh_inv, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if contours is None:
+        contours, _ = cv2.findContours(thresh_inv, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     
     # Filter for dots
     dots = []
@@ -75,19 +96,27 @@ def analyze_dot_grid(gray, thresh_inv):
     if len(dots) < 2:
         return None
         
-    # Estimate grid parameters
-    distances = pdist(dots)
-    dist_matrix = squareform(distances)
-    
-    # Estimate spacing
-    min_distances = np.min(dist_matrix + np.eye(len(dots)) * np.max(dist_matrix), axis=1)
-    spacing = np.median(min_distances)
-    
-    # Estimate orientation
-    tested_angles = np.linspace(-np.pi / 2, np.pi / 2, 360)
-    h, theta, d = hough_line(thresh_inv, theta=tested_angles)
-    _, angles, _ = hough_line_peaks(h, theta, d)
-    orientation = np.rad2deg(np.median(angles))
+    # Each dot's nearest neighbours (the closest hit for each dot is the dot itself)
+    points = np.asarray(dots, dtype=np.float64)
+    k = min(GRID_NEIGHBORS + 1, len(points))
+    nearest, neighbors = cKDTree(points).query(points, k=k, workers=-1)
+    
+    # Estimate spacing: median nearest-neighbour distance
+    spacing = np.median(nearest[:, 1])
+    
+    # Estimate orientation from the directions to the neighbouring dots. A grid
+    # repeats every 90 degrees, so angles are taken at four times their value,
+    # centred on their circular mean and summarized by the median deviation;
+    # the result is reported in [-45, 45) degrees
+    offsets = points[neighbors[:, 1:]] - points[:, None, :]
+    offsets = offsets[nearest[:, 1:] > 0]
+    angles = 4 * np.arctan2(offsets[:, 1], offsets[:, 0])
+    if len(angles) > 0:
+        mean_angle = np.arctan2(np.sin(angles).sum(), np.cos(angles).sum())
+        deviation = np.median(np.angle(np.exp(1j * (angles - mean_angle))))
+        orientation = (np.rad2deg((mean_angle + deviation) / 4) + 45) % 90 - 45
+    else:
+        orientation = 0.0
     
     return {
         "rows": int(np.sqrt(len(dots))),
@@ -106,13 +135,14 @@ def analyze_loops_and_connectivity(G):
     Returns:
         dict: A dictionary containing the loop and connectivity analysis results.
     """
-    is_connected = nx.is_connected(G)
-    num_components = nx.number_connected_components(G)
-    
-    try:
-        eulerian_path = nx.has_eulerian_path(G)
-    except nx.NetworkXError:
-        eulerian_path = False
+    adjacency = graph_adjacency(G)
+    num_components = connected_components(adjacency, directed=False, return_labels=False)
+    is_connected = num_components == 1
+    
+    # A connected graph has an Eulerian path exactly when it has zero or two
+    # odd-degree vertices
+    odd_vertices = np.count_nonzero(np.diff(adjacency.indptr) & 1)
+    eulerian_path = is_connected and odd_vertices in (0, 2)
         
     return {
         "is_connected": is_connected,
@@ -120,20 +150,24 @@ def analyze_loops_and_connectivity(G):
         "eulerian_path_feasibility": eulerian_path
     }
 
-def analyze_proportions(thresh_inv):
+def analyze_proportions(thresh_inv, motif_area=None):
     """
     Analyzes the proportions and ratios of an image.
     
     Args:
         thresh_inv (np.ndarray): The input inverted binary thresholded image.
+        motif_area (int, optional): Precomputed count of nonzero pixels in thresh_inv.
         
     Returns:
         dict: A dictionary containing the proportion analysis results.
     """
-    dist_transform = cv2.distanceTransform(thresh_inv, cv2.DIST_L2, 5)
-    stroke_thickness = np.mean(dist_transform[dist_transform > 0]) if np.any(dist_transform > 0) else 0
+    if motif_area is None:
+        motif_area = cv2.countNonZero(thresh_inv)
     
-    motif_area = np.sum(thresh_inv > 0)
+    # The distance is positive exactly on the motif pixels, so the image itself
+    # masks the mean; no boolean mask or compacted copy is allocated
+    dist_transform = cv2.distanceTransform(thresh_inv, cv2.DIST_L2, 5)
+    stroke_thickness = cv2.mean(dist_transform, mask=thresh_inv)[0] if motif_area > 0 else 0
     canvas_area = thresh_inv.shape[0] * thresh_inv.shape[1]
     motif_to_canvas_ratio = motif_area / canvas_area
     
@@ -156,28 +190,36 @@ def analyze_computational_complexity(thresh, G):
     
     def fractal_dimension(Z, threshold=0.9):
         assert(len(Z.shape) == 2)
-        def boxcount(Z, k):
-            S = np.add.reduceat(
-                np.add.reduceat(Z, np.arange(0, Z.shape[0], k), axis=0),
-                                   np.arange(0, Z.shape[1], k), axis=1)
-            return len(np.where((S > 0) & (S < k*k))[0])
+        def boxcount(sat, k):
+            # Box sums from four corner lookups into the summed-area table
+            rows = np.arange(0, Z.shape[0], k)
+            cols = np.arange(0, Z.shape[1], k)
+            r1, r2 = rows[:, None], np.minimum(rows + k, Z.shape[0])[:, None]
+            c1, c2 = cols, np.minimum(cols + k, Z.shape[1])
+            S = sat[r2, c2] - sat[r1, c2] - sat[r2, c1] + sat[r1, c1]
+            return np.count_nonzero((S > 0) & (S < k*k))
         Z = (Z < threshold)
+        # One summed-area table serves every box size
+        sat = cv2.integral(Z.view(np.uint8))
         p = min(Z.shape)
         n = 2**np.floor(np.log(p)/np.log(2))
         n = int(np.log(n)/np.log(2))
         sizes = 2**np.arange(n, 1, -1)
         counts = []
         for size in sizes:
-            counts.append(boxcount(Z, size))
+            counts.append(boxcount(sat, size))
         coeffs = np.polyfit(np.log(sizes), np.log(counts), 1)
         return -coeffs[0]
         
+    adjacency = graph_adjacency(G)
+    num_edges = adjacency.nnz // 2
+    degree_histogram = np.bincount(np.diff(adjacency.indptr))
     return {
-        "stroke_trace_complexity": G.number_of_edges(),
+        "stroke_trace_complexity": num_edges,
         "graph_metrics": {
-            "nodes": G.number_of_nodes(),
-            "edges": G.number_of_edges(),
-            "degree_distribution": {i: count for i, count in enumerate(nx.degree_histogram(G))}
+            "nodes": adjacency.shape[0],
+            "edges": num_edges,
+            "degree_distribution": dict(enumerate(degree_histogram.tolist()))
         },
         "fractal_dimension": fractal_dimension(thresh)
     }
@@ -197,12 +239,15 @@ def analyze_topological_features(G):
     except nx.NetworkXError:
         hamiltonian_path = None
     try:
-        is_planar, _ = nx.check_planarity(G)
+        is_planar = check_planarity_by_component(G)
     except nx.NetworkXError:
         is_planar = False
+    # b1 is the size of a cycle basis, E - V + b0, so no basis is enumerated
+    adjacency = graph_adjacency(G)
+    b0 = connected_components(adjacency, directed=False, return_labels=False)
     betti_numbers = {
-        "b0": nx.number_connected_components(G),
-        "b1": len(nx.cycle_basis(G)) if is_planar else "Graph is not planar"
+        "b0": b0,
+        "b1": adjacency.nnz // 2 - adjacency.shape[0] + b0 if is_planar else "Graph is not planar"
     }
     return {
         "hamiltonian_path": hamiltonian_path,
@@ -210,38 +255,51 @@ def analyze_topological_features(G):
         "betti_numbers": betti_numbers
     }
 
-def analyze_shape_and_pattern(thresh_inv):
+def analyze_shape_and_pattern(thresh_inv, motif_area=None, contours=None):
     """
     Analyzes the shape and pattern of an image.
     
     Args:
         thresh_inv (np.ndarray): The input inverted binary thresholded image.
+        motif_area (int, optional): Precomputed count of nonzero pixels in thresh_inv.
+        contours (list, optional): Precomputed external contours of thresh_inv.
         
     Returns:
         dict: A dictionary containing the shape and pattern analysis results.
     """
-    contours, _ = cv2.findContours(thresh_inv, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
-    if len(contours) > 0:
-        contour = max(contours, key=cv2.contourArea)
+    if contours is None:
+        contours, _ = cv2.findContours(thresh_inv, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    contour = max(contours, key=cv2.contourArea) if len(contours) > 0 else None
+    if contour is not None:
         fourier_descriptors = cv2.dft(np.float32(contour), flags=cv2.DFT_COMPLEX_OUTPUT)
     else:
         fourier_descriptors = None
     zernike_moments = cv2.moments(thresh_inv)
     curvature = None
-    if len(contours) > 0:
-        contour = max(contours, key=cv2.contourArea)
+    if contour is not None:
         if len(contour) > 5:
-            dx = np.gradient(contour[:, 0, 0])
-            dy = np.gradient(contour[:, 0, 1])
-            ddx = np.gradient(dx)
-            ddy = np.gradient(dy)
-            curvature = np.abs(dx * ddy - dy * ddx) / (dx**2 + dy**2)**1.5
-    negative_space = np.sum(thresh_inv == 0) / (thresh_inv.shape[0] * thresh_inv.shape[1])
-    density = np.sum(thresh_inv > 0) / (thresh_inv.shape[0] * thresh_inv.shape[1])
+            # Differentiate both coordinate rows in one call per order, then
+            # combine in place to keep temporaries to a minimum
+            first = np.gradient(contour[:, 0, :].T.astype(np.float64), axis=1)
+            second = np.gradient(first, axis=1)
+            (dx, dy), (ddx, ddy) = first, second
+            curvature = dx * ddy
+            curvature -= dy * ddx
+            np.abs(curvature, out=curvature)
+            speed = dx * dx
+            speed += dy * dy
+            speed **= 1.5
+            curvature /= speed
+    if motif_area is None:
+        motif_area = cv2.countNonZero(thresh_inv)
+    canvas_area = thresh_inv.shape[0] * thresh_inv.shape[1]
+    negative_space = (canvas_area - motif_area) / canvas_area
+    density = motif_area / canvas_area
     return {
-        "fourier_descriptors": fourier_descriptors.tolist() if fourier_descriptors is not None else None,
+        # Left as arrays: the API serializes NumPy buffers directly with orjson
+        "fourier_descriptors": fourier_descriptors,
         "zernike_moments": zernike_moments,
-        "curvature": curvature.tolist() if curvature is not None else None,
+        "curvature": curvature,
         "negative_space": negative_space,
         "density": density
     }
@@ -256,17 +314,30 @@ def analyze_artistic_style(gray):
     Returns:
         dict: A dictionary containing the artistic style analysis results.
     """
+    # Half-image intensity sums with OpenCV's SIMD reduction, which accumulates
+    # uint8 pixels in narrow integers rather than upcasting every pixel to 64
+    # bits; the right and bottom halves follow from the total
     h, w = gray.shape
-    left_half = gray[:, :w//2]
-    right_half = gray[:, w//2:]
-    top_half = gray[:h//2, :]
-    bottom_half = gray[h//2:, :]
+    total = cv2.sumElems(gray)[0]
+    left_sum = cv2.sumElems(gray[:, :w//2])[0]
+    right_sum = total - left_sum
+    top_sum = cv2.sumElems(gray[:h//2, :])[0]
+    bottom_sum = total - top_sum
     balance = {
-        "horizontal": np.sum(left_half) / np.sum(right_half) if np.sum(right_half) > 0 else 1,
-        "vertical": np.sum(top_half) / np.sum(bottom_half) if np.sum(bottom_half) > 0 else 1
+        "horizontal": left_sum / right_sum if right_sum > 0 else 1,
+        "vertical": top_sum / bottom_sum if bottom_sum > 0 else 1
     }
-    edges = cv2.Canny(gray, 100, 200)
-    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 100, minLineLength=100, maxLineGap=10)
+    if CUDA_AVAILABLE:
+        # Same edge and segment detection, voted on the GPU
+        gpu_gray = cv2.cuda_GpuMat()
+        gpu_gray.upload(gray)
+        gpu_edges = cv2.cuda.createCannyEdgeDetector(100, 200).detect(gpu_gray)
+        detector = cv2.cuda.createHoughSegmentDetector(1.0, np.pi / 180, minLineLength=100, maxLineGap=10, threshold=100)
+        gpu_lines = detector.detect(gpu_edges)
+        lines = None if gpu_lines.empty() else gpu_lines.download().reshape(-1, 4)
+    else:
+        edges = cv2.Canny(gray, 100, 200)
+        lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 100, minLineLength=100, maxLineGap=10)
     rhythm = len(lines) if lines is not None else 0
     style = "geometric"
     return {
@@ -298,6 +369,126 @@ def analyze_historical_and_regional_inference(image):
         "hybrid_cnn_gnn_classifier": hybrid_cnn_gnn_classifier
     }
 
+# Forward 8-neighbourhood offsets (dr, dc): each undirected pixel adjacency is
+# found exactly once, from the pixel that comes first in row-major order
+FORWARD_NEIGHBOR_OFFSETS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+def skeleton_to_graph(skeleton):
+    """
+    Builds the 8-connected pixel graph of a skeleton.
+    
+    Nodes are (row, col) tuples of skeleton pixels that touch at least one other
+    skeleton pixel. Edges are found with one vectorized neighbour lookup per
+    forward offset, and nodes and edges are inserted in the order a row-major
+    pixel scan would add them, so graph traversals visit them in that order.
+    
+    Args:
+        skeleton (np.ndarray): The input skeleton image (nonzero on the skeleton).
+        
+    Returns:
+        nx.Graph: The pixel adjacency graph.
+    """
+    rows, cols = np.nonzero(skeleton)
+    n = len(rows)
+    
+    # Row-major rank of every skeleton pixel, -1 elsewhere (and on the padding)
+    rank = np.full((skeleton.shape[0] + 2, skeleton.shape[1] + 2), -1, dtype=np.int64)
+    rank[rows + 1, cols + 1] = np.arange(n)
+    
+    sources, targets = [], []
+    for dr, dc in FORWARD_NEIGHBOR_OFFSETS:
+        neighbor = rank[rows + 1 + dr, cols + 1 + dc]
+        has_neighbor = neighbor >= 0
+        sources.append(np.flatnonzero(has_neighbor))
+        targets.append(neighbor[has_neighbor])
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    
+    # A scan adds edges in (earlier pixel, later pixel) order, and a pixel enters
+    # the graph with the edge from its earliest neighbour (or itself, if earlier)
+    edge_order = np.lexsort((targets, sources))
+    sources, targets = sources[edge_order], targets[edge_order]
+    first_seen = np.arange(n)
+    np.minimum.at(first_seen, targets, sources)
+    in_graph = np.zeros(n, dtype=bool)
+    in_graph[sources] = True
+    in_graph[targets] = True
+    node_order = np.flatnonzero(in_graph)
+    node_order = node_order[np.argsort(first_seen[node_order], kind='stable')]
+    
+    coords = list(zip(rows.tolist(), cols.tolist()))
+    G = nx.Graph()
+    G.add_nodes_from(coords[i] for i in node_order.tolist())
+    G.add_edges_from((coords[u], coords[v]) for u, v in zip(sources.tolist(), targets.tolist()))
+    
+    # Symmetric CSR adjacency over the nodes in graph order, for the analyzers
+    index = np.empty(n, dtype=np.int64)
+    index[node_order] = np.arange(len(node_order))
+    u, v = index[sources], index[targets]
+    G.graph['adjacency'] = csr_array(
+        (np.ones(2 * len(u), dtype=np.int8), (np.concatenate((u, v)), np.concatenate((v, u)))),
+        shape=(len(node_order), len(node_order))
+    )
+    return G
+
+def graph_adjacency(G):
+    """
+    Returns the CSR adjacency matrix of a graph, reusing the one that
+    skeleton_to_graph attaches instead of converting the graph again.
+    
+    Args:
+        G (nx.Graph): The input graph.
+        
+    Returns:
+        scipy.sparse.csr_array: The symmetric adjacency matrix.
+    """
+    if 'adjacency' not in G.graph:
+        # to_scipy_sparse_array rejects graphs without nodes
+        if G.number_of_nodes() == 0:
+            G.graph['adjacency'] = csr_array((0, 0), dtype=np.int8)
+        else:
+            G.graph['adjacency'] = nx.to_scipy_sparse_array(G, dtype=np.int8, format='csr')
+    return G.graph['adjacency']
+
+def check_planarity_by_component(G):
+    """
+    Tests whether a graph is planar one connected component at a time.
+    
+    A graph is planar exactly when all of its components are. Components with
+    fewer than 5 vertices or 9 edges cannot contain a K5 or K3,3 subdivision
+    and are skipped, any component with more than 3V - 6 edges fails without
+    a planarity test, and the rest are tested largest first, stopping at the
+    first non-planar one.
+    
+    Args:
+        G (nx.Graph): The input graph.
+        
+    Returns:
+        bool: Whether the graph is planar.
+    """
+    adjacency = graph_adjacency(G)
+    num_components, labels = connected_components(adjacency, directed=False)
+    num_vertices = np.bincount(labels, minlength=num_components)
+    num_edges = np.bincount(labels, weights=np.diff(adjacency.indptr), minlength=num_components) // 2
+    candidates = (num_vertices >= 5) & (num_edges >= 9)
+    if np.any(candidates & (num_edges > 3 * num_vertices - 6)):
+        return False
+    
+    nodes = list(G)
+    for component in np.argsort(-num_vertices, kind='stable'):
+        if not candidates[component]:
+            continue
+        members = np.flatnonzero(labels == component)
+        is_planar, _ = nx.check_planarity(G.subgraph([nodes[i] for i in members.tolist()]))
+        if not is_planar:
+            return False
+    return True
+
+# LRU memo of finished reports keyed by a digest of the image file's bytes
+REPORT_CACHE_SIZE = 32
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+
 def generate_analysis_report_stream(image_path):
     """
     Generates a comprehensive analysis report for an image, yielding progress updates.
@@ -324,49 +515,86 @@ def generate_analysis_report_stream(image_path):
     start_time = time.time()
     
     yield progress(1, "Loading and preprocessing image...", start_time)
-    image = cv2.imread(image_path)
+    with open(image_path, 'rb') as f:
+        contents = f.read()
+    
+    # Re-uploads of an image already analyzed get the finished report at once
+    cache_key = hashlib.blake2b(contents, digest_size=16).digest()
+    with _report_cache_lock:
+        cached_report = _report_cache.get(cache_key)
+        if cached_report is not None:
+            _report_cache.move_to_end(cache_key)
+    if cached_report is not None:
+        yield {"progress": 100, "report": cached_report}
+        return
+    
+    image = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
     if image is None:
         raise ValueError("Could not read the image. The file may be corrupted or in an unsupported format.")
     
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     _, thresh = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-    _, thresh_inv = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY_INV)
-    
-    yield progress(2, "Analyzing symmetry...", start_time)
-    symmetry_analysis = analyze_symmetry(gray, thresh)
-    
-    yield progress(3, "Analyzing dot grid...", start_time)
-    dot_grid_analysis = analyze_dot_grid(gray, thresh_inv)
-    
-    yield progress(4, "Analyzing proportions...", start_time)
-    proportions_analysis = analyze_proportions(thresh_inv)
-    
-    yield progress(5, "Building graph representation...", start_time)
-    skeleton = cv2.ximgproc.thinning(thresh_inv)
-    G = nx.Graph()
-    h, w = skeleton.shape
-    for r in range(h):
-        for c in range(w):
-            if skeleton[r, c] > 0:
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        if dr == 0 and dc == 0:
-                            continue
-                        if 0 <= r + dr < h and 0 <= c + dc < w and skeleton[r + dr, c + dc] > 0:
-                            G.add_edge((r, c), (r + dr, c + dc))
-
-    yield progress(6, "Analyzing computational complexity...", start_time)
-    computational_complexity_analysis = analyze_computational_complexity(thresh, G)
-    
-    yield progress(7, "Analyzing topological features...", start_time)
-    topological_features_analysis = analyze_topological_features(G)
-    
-    yield progress(8, "Analyzing shape and pattern...", start_time)
-    shape_and_pattern_analysis = analyze_shape_and_pattern(thresh_inv)
+    # The inverse threshold is exactly the complement of the binary one
+    thresh_inv = cv2.bitwise_not(thresh)
+    motif_area = cv2.countNonZero(thresh_inv)
+    
+    # Symmetry scores are pixel-agreement ratios that barely move under area
+    # downsampling, so large images are compared at a reduced size. Stroke
+    # thickness and the box-counting dimension depend on thin gaps that
+    # downsampling closes, so they, like the contours and skeleton, stay full size.
+    scale = SYMMETRY_MAX_SIDE / max(gray.shape)
+    if scale < 1:
+        gray_small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        _, thresh_small = cv2.threshold(gray_small, 127, 255, cv2.THRESH_BINARY)
+    else:
+        thresh_small = thresh
     
-    yield progress(9, "Finalizing report...", start_time)
-    artistic_style_analysis = analyze_artistic_style(gray)
-    historical_analysis = analyze_historical_and_regional_inference(image)
+    # Every analyzer only reads the preprocessed arrays, so they run concurrently
+    # (OpenCV and NumPy release the GIL). The skeleton graph feeds the complexity
+    # and topology analyzers, so it is started first and they follow once it is built.
+    executor = ThreadPoolExecutor(max_workers=4)
+    try:
+        graph_future = executor.submit(lambda: skeleton_to_graph(cv2.ximgproc.thinning(thresh_inv)))
+        symmetry_future = executor.submit(analyze_symmetry, gray, thresh_small)
+        proportions_future = executor.submit(analyze_proportions, thresh_inv, motif_area)
+        artistic_style_future = executor.submit(analyze_artistic_style, gray)
+        historical_future = executor.submit(analyze_historical_and_regional_inference, image)
+        
+        # Traced here while the pool thins the skeleton, then shared by the dot
+        # grid and shape analyzers
+        contours, _ = cv2.findContours(thresh_inv, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        dot_grid_future = executor.submit(analyze_dot_grid, gray, thresh_inv, contours)
+        shape_and_pattern_future = executor.submit(analyze_shape_and_pattern, thresh_inv, motif_area, contours)
+        
+        yield progress(2, "Analyzing symmetry...", start_time)
+        symmetry_analysis = symmetry_future.result()
+        
+        yield progress(3, "Analyzing dot grid...", start_time)
+        dot_grid_analysis = dot_grid_future.result()
+        
+        yield progress(4, "Analyzing proportions...", start_time)
+        proportions_analysis = proportions_future.result()
+        
+        yield progress(5, "Building graph representation...", start_time)
+        G = graph_future.result()
+        computational_complexity_future = executor.submit(analyze_computational_complexity, thresh, G)
+        topological_features_future = executor.submit(analyze_topological_features, G)
+        
+        yield progress(6, "Analyzing computational complexity...", start_time)
+        computational_complexity_analysis = computational_complexity_future.result()
+        
+        yield progress(7, "Analyzing topological features...", start_time)
+        topological_features_analysis = topological_features_future.result()
+        
+        yield progress(8, "Analyzing shape and pattern...", start_time)
+        shape_and_pattern_analysis = shape_and_pattern_future.result()
+        
+        yield progress(9, "Finalizing report...", start_time)
+        artistic_style_analysis = artistic_style_future.result()
+        historical_analysis = historical_future.result()
+    finally:
+        # Drop queued analyzers if the client went away mid-stream
+        executor.shutdown(wait=False, cancel_futures=True)
     
     report = {
         "tier1_core_must_have_analysis": {
@@ -385,8 +613,38 @@ def generate_analysis_report_stream(image_path):
         "tier4_historical_and_regional_inference": historical_analysis
     }
     
+    with _report_cache_lock:
+        _report_cache[cache_key] = report
+        if len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    
     yield {"progress": 100, "report": report}
 
+def throttle_progress(stream, min_interval=0.05):
+    """
+    Drops progress-only updates that arrive within `min_interval` seconds of the
+    previously forwarded one, so fast stages do not each cost a client frame.
+    
+    Args:
+        stream (iterator): A report stream such as generate_analysis_report_stream.
+        min_interval (float): Minimum number of seconds between progress updates.
+        
+    Yields:
+        dict: The forwarded progress updates, always including the final report.
+    """
+    last_emitted = None
+    try:
+        for result in stream:
+            now = time.monotonic()
+            if "report" not in result and last_emitted is not None and now - last_emitted < min_interval:
+                continue
+            last_emitted = now
+            yield result
+    finally:
+        # Closing this wrapper closes the report stream right away, which shuts
+        # down its analyzer pool instead of waiting for garbage collection
+        stream.close()
+
 def generate_analysis_report(image_path):
     """
     Generates a comprehensive analysis report for an image.
@@ -16,14 +16,18 @@ Key Design Principles Analyzed:
 import numpy as np
 import cv2
 import networkx as nx
+from scipy.spatial import cKDTree
 from scipy.spatial.distance import pdist, squareform
-from scipy.ndimage import rotate
 from skimage.measure import regionprops, label
 from skimage.morphology import skeletonize, thin
 import matplotlib.pyplot as plt
 from typing import List, Tuple, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 import json
 
+# Longest image side symmetry is measured at; larger images are downsampled
+SYMMETRY_MAX_SIDE = 512
+
 class KolamDesignPrinciples:
     """
     Analyzes and identifies the core design principles of Kolam patterns.
@@ -48,12 +52,22 @@ class KolamDesignPrinciples:
             raise ValueError("Either image_path or image_array must be provided")
             
         self.binary_image = None
+        self.edges = None
+        self.contours = None
+        self.contour_areas = None
         self.skeleton = None
         self.dots = []
+        self.dots_xy = np.empty((0, 2), dtype=np.int32)
         self.grid_structure = {}
         self.design_graph = nx.Graph()
         self.design_principles = {}
         
+        # Results of the individual analyses, filled on first call
+        self._grid_cache = None
+        self._connectivity_cache = None
+        self._symmetry_cache = None
+        self._patterns_cache = None
+        
     def preprocess_image(self) -> np.ndarray:
         """
         Preprocess the image for analysis.
@@ -61,6 +75,9 @@ class KolamDesignPrinciples:
         Returns:
             Binary image ready for analysis
         """
+        if self.binary_image is not None:
+            return self.binary_image
+        
         # Apply Gaussian blur to reduce noise
         blurred = cv2.GaussianBlur(self.image, (5, 5), 0)
         
@@ -76,6 +93,16 @@ class KolamDesignPrinciples:
         binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
         
         self.binary_image = binary
+        
+        # Edges and outer contours are shared by the dot grid and pattern analyses.
+        # Canny runs on explicit 16-bit Sobel derivatives with the L2 gradient norm.
+        grad_x = cv2.Sobel(binary, cv2.CV_16S, 1, 0, ksize=3)
+        grad_y = cv2.Sobel(binary, cv2.CV_16S, 0, 1, ksize=3)
+        self.edges = cv2.Canny(grad_x, grad_y, 50, 150, L2gradient=True)
+        self.contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        self.contour_areas = np.fromiter(
+            (cv2.contourArea(c) for c in self.contours), dtype=np.float64, count=len(self.contours)
+        )
         return binary
     
     def detect_dot_grid(self) -> Dict:
@@ -85,77 +112,70 @@ class KolamDesignPrinciples:
         Returns:
             Dictionary containing grid properties
         """
+        if self._grid_cache is not None:
+            return self._grid_cache
+        
         if self.binary_image is None:
             self.preprocess_image()
             
-        # Find contours to identify dots
-        contours, _ = cv2.findContours(
-            self.binary_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        # Filter contours to find dots: area bounds first, then circularity
+        areas = self.contour_areas
+        candidates = np.flatnonzero((areas > 10) & (areas < 1000))
+        perimeters = np.fromiter(
+            (cv2.arcLength(self.contours[i], True) for i in candidates),
+            dtype=np.float64, count=len(candidates)
         )
+        closed = perimeters > 0
+        candidates, perimeters = candidates[closed], perimeters[closed]
+        circularity = 4 * np.pi * areas[candidates] / (perimeters * perimeters)
         
-        # Filter contours to find dots
+        # Centroids from moments, only for reasonably circular contours
         dots = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            
-            # Filter by area and circularity
-            if 10 < area < 1000:
-                perimeter = cv2.arcLength(contour, True)
-                if perimeter > 0:
-                    circularity = 4 * np.pi * area / (perimeter * perimeter)
-                    
-                    if circularity > 0.3:  # Reasonably circular
-                        M = cv2.moments(contour)
-                        if M["m00"] != 0:
-                            cx = int(M["m10"] / M["m00"])
-                            cy = int(M["m01"] / M["m00"])
-                            dots.append((cx, cy))
+        for i in candidates[circularity > 0.3]:
+            M = cv2.moments(self.contours[i])
+            if M["m00"] != 0:
+                dots.append((int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"])))
         
         if len(dots) < 4:
-            return {"error": "Insufficient dots detected for grid analysis"}
+            self._grid_cache = {"error": "Insufficient dots detected for grid analysis"}
+            return self._grid_cache
         
+        # Dots are kept as an (N, 2) array for analysis, plus the tuple list view
+        self.dots_xy = np.array(dots, dtype=np.int32)
         self.dots = dots
         
         # Analyze grid structure
-        return self._analyze_grid_structure(dots)
+        self._grid_cache = self._analyze_grid_structure(self.dots_xy)
+        return self._grid_cache
     
-    def _analyze_grid_structure(self, dots: List[Tuple[int, int]]) -> Dict:
+    def _analyze_grid_structure(self, dots: np.ndarray) -> Dict:
         """
         Analyze the structure of the dot grid.
         
         Args:
-            dots: List of (x, y) coordinates of detected dots
+            dots: (N, 2) array of (x, y) coordinates of detected dots
             
         Returns:
             Grid structure analysis
         """
-        dots_array = np.array(dots)
-        
-        # Calculate pairwise distances
-        distances = pdist(dots_array)
+        # Calculate pairwise distances once; the condensed form is reused for regularity
+        distances = pdist(dots)
         distance_matrix = squareform(distances)
         
         # Find grid spacing (most common minimum distance)
-        min_distances = []
-        for i in range(len(dots)):
-            row_distances = distance_matrix[i]
-            row_distances[i] = np.inf  # Exclude self
-            min_distances.append(np.min(row_distances))
+        np.fill_diagonal(distance_matrix, np.inf)  # Exclude self
+        min_distances = distance_matrix.min(axis=1)
         
         spacing = np.median(min_distances)
         
-        # Estimate grid dimensions
-        x_coords = sorted(set(round(x / spacing) * spacing for x, y in dots))
-        y_coords = sorted(set(round(y / spacing) * spacing for x, y in dots))
-        
-        cols = len(x_coords)
-        rows = len(y_coords)
+        # Estimate grid dimensions from the distinct spacing multiples per axis
+        cols, rows = (len(np.unique(np.rint(dots[:, axis] / spacing))) for axis in (0, 1))
         
         # Analyze grid regularity
-        regularity_score = self._calculate_grid_regularity(dots_array, spacing)
+        regularity_score = self._calculate_grid_regularity(distances, spacing)
         
         # Detect grid type (square, triangular, hexagonal)
-        grid_type = self._detect_grid_type(dots_array, spacing)
+        grid_type = self._detect_grid_type(dots, spacing)
         
         self.grid_structure = {
             "num_dots": len(dots),
@@ -165,68 +185,39 @@ class KolamDesignPrinciples:
             "grid_type": grid_type,
             "regularity_score": regularity_score,
             "bounding_box": {
-                "width": max(x for x, y in dots) - min(x for x, y in dots),
-                "height": max(y for x, y in dots) - min(y for x, y in dots)
+                "width": int(np.ptp(dots[:, 0])),
+                "height": int(np.ptp(dots[:, 1]))
             }
         }
         
         return self.grid_structure
     
-    def _calculate_grid_regularity(self, dots: np.ndarray, expected_spacing: float) -> float:
-        """Calculate how regular the grid structure is."""
-        if len(dots) < 2:
+    def _calculate_grid_regularity(self, distances: np.ndarray, expected_spacing: float) -> float:
+        """Calculate how regular the grid structure is from condensed pairwise distances."""
+        if len(distances) == 0:
             return 0.0
-            
-        distance_matrix = squareform(pdist(dots))
         
-        # Count how many distances are close to expected spacing or its multiples
+        # Fraction of distances close to the expected spacing or one of its multiples
         tolerance = expected_spacing * 0.2
-        regular_distances = 0
-        total_distances = 0
-        
-        for i in range(len(dots)):
-            for j in range(i + 1, len(dots)):
-                dist = distance_matrix[i, j]
-                total_distances += 1
-                
-                # Check if distance is close to spacing multiples
-                multiple = round(dist / expected_spacing)
-                expected_dist = multiple * expected_spacing
-                
-                if abs(dist - expected_dist) < tolerance:
-                    regular_distances += 1
-        
-        return regular_distances / total_distances if total_distances > 0 else 0.0
+        multiples = np.rint(distances / expected_spacing)
+        regular = np.abs(distances - multiples * expected_spacing) < tolerance
+        return float(regular.mean())
     
     def _detect_grid_type(self, dots: np.ndarray, spacing: float) -> str:
         """Detect the type of grid (square, triangular, hexagonal)."""
         if len(dots) < 6:
             return "insufficient_data"
         
-        # Analyze angles between nearest neighbors
-        angles = []
+        # Angles from every dot to its 6 nearest neighbors, found in one k-d tree query
+        _, neighbor_indices = cKDTree(dots).query(dots, k=min(7, len(dots)))
+        vectors = dots[neighbor_indices[:, 1:]] - dots[:, None, :]
+        vectors = vectors[np.any(vectors != 0, axis=-1)]  # Skip coincident dots
         
-        for i, dot in enumerate(dots):
-            # Find nearest neighbors
-            distances = np.sqrt(np.sum((dots - dot) ** 2, axis=1))
-            neighbor_indices = np.argsort(distances)[1:7]  # Exclude self, get 6 nearest
-            
-            neighbors = dots[neighbor_indices]
-            
-            # Calculate angles to neighbors
-            for neighbor in neighbors:
-                if np.allclose(neighbor, dot):
-                    continue
-                    
-                vector = neighbor - dot
-                angle = np.arctan2(vector[1], vector[0])
-                angles.append(angle % (2 * np.pi))
-        
-        if not angles:
+        if len(vectors) == 0:
             return "unknown"
         
         # Analyze angle distribution
-        angles = np.array(angles)
+        angles = np.arctan2(vectors[:, 1], vectors[:, 0]) % (2 * np.pi)
         angle_hist, _ = np.histogram(angles, bins=12, range=(0, 2 * np.pi))
         
         # Detect patterns in angle distribution
@@ -250,29 +241,33 @@ class KolamDesignPrinciples:
         # Create skeleton
         self.skeleton = skeletonize(self.binary_image)
         
-        # Build graph from skeleton
+        # Build graph from skeleton: one node per skeleton pixel, keyed (x, y)
         graph = nx.Graph()
         h, w = self.skeleton.shape
-        
-        # Add nodes for skeleton pixels
-        skeleton_points = np.where(self.skeleton > 0)
-        for i in range(len(skeleton_points[0])):
-            y, x = skeleton_points[0][i], skeleton_points[1][i]
-            graph.add_node((x, y))
-        
-        # Add edges between neighboring skeleton pixels
-        for i in range(len(skeleton_points[0])):
-            y, x = skeleton_points[0][i], skeleton_points[1][i]
-            
-            # Check 8-connectivity
-            for dy in [-1, 0, 1]:
-                for dx in [-1, 0, 1]:
-                    if dx == 0 and dy == 0:
-                        continue
-                    
-                    ny, nx = y + dy, x + dx
-                    if 0 <= ny < h and 0 <= nx < w and self.skeleton[ny, nx] > 0:
-                        graph.add_edge((x, y), (nx, ny))
+        ys, xs = np.nonzero(self.skeleton)
+        nodes = list(zip(xs.tolist(), ys.tolist()))
+        graph.add_nodes_from(nodes)
+        
+        # Row-major index of every skeleton pixel, -1 elsewhere and on the padding
+        index = np.full((h + 2, w + 2), -1, dtype=np.int64)
+        index[ys + 1, xs + 1] = np.arange(len(nodes))
+        
+        # Each 8-connected pair is found once, from its earlier pixel, by looking up
+        # the forward neighbors (right, then the three below) of all pixels at once
+        sources, targets = [], []
+        for dy, dx in ((0, 1), (1, -1), (1, 0), (1, 1)):
+            neighbor = index[ys + 1 + dy, xs + 1 + dx]
+            has_neighbor = neighbor >= 0
+            sources.append(np.flatnonzero(has_neighbor))
+            targets.append(neighbor[has_neighbor])
+        sources = np.concatenate(sources)
+        targets = np.concatenate(targets)
+        
+        # Insert edges in the order a row-major pixel scan would discover them
+        order = np.lexsort((targets, sources))
+        graph.add_edges_from(
+            (nodes[i], nodes[j]) for i, j in zip(sources[order].tolist(), targets[order].tolist())
+        )
         
         self.design_graph = graph
         return graph
@@ -284,29 +279,46 @@ class KolamDesignPrinciples:
         Returns:
             Dictionary containing symmetry analysis
         """
+        if self._symmetry_cache is not None:
+            return self._symmetry_cache
+        
         if self.binary_image is None:
             self.preprocess_image()
         
-        image = self.binary_image.astype(np.float32)
+        # Every comparison stays on the uint8 binary image: flips, warps and
+        # absolute differences all run natively on 8-bit data
+        image = self.binary_image
+        
+        # Symmetry scores are averages over the whole image, so large images are
+        # compared at a reduced size and re-binarized; much smaller targets
+        # erase thin strokes and shift the scores by several percent
+        scale = SYMMETRY_MAX_SIDE / max(image.shape)
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            _, image = cv2.threshold(image, 127, 255, cv2.THRESH_BINARY)
         h, w = image.shape
         
         symmetries = {}
         
         # Vertical reflection symmetry
         flipped_v = cv2.flip(image, 1)
-        v_symmetry = np.mean(np.abs(image - flipped_v)) / 255.0
+        v_symmetry = cv2.mean(cv2.absdiff(image, flipped_v))[0] / 255.0
         symmetries['vertical_reflection'] = 1.0 - v_symmetry
         
         # Horizontal reflection symmetry
         flipped_h = cv2.flip(image, 0)
-        h_symmetry = np.mean(np.abs(image - flipped_h)) / 255.0
+        h_symmetry = cv2.mean(cv2.absdiff(image, flipped_h))[0] / 255.0
         symmetries['horizontal_reflection'] = 1.0 - h_symmetry
         
-        # Rotational symmetries
+        # Rotational symmetries: nearest-neighbor affine warps about the image
+        # center, which keep the image binary and avoid spline interpolation
+        center = ((w - 1) / 2.0, (h - 1) / 2.0)
         rotational_symmetries = {}
         for angle in [45, 90, 120, 135, 180, 240, 270]:
-            rotated = rotate(image, angle, reshape=False, mode='constant', cval=0)
-            rot_symmetry = np.mean(np.abs(image - rotated)) / 255.0
+            rotation = cv2.getRotationMatrix2D(center, angle, 1.0)
+            rotated = cv2.warpAffine(image, rotation, (w, h), flags=cv2.INTER_NEAREST,
+                                     borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+            rot_symmetry = cv2.mean(cv2.absdiff(image, rotated))[0] / 255.0
             rotational_symmetries[f'{angle}_degrees'] = 1.0 - rot_symmetry
         
         symmetries['rotational'] = rotational_symmetries
@@ -318,6 +330,7 @@ class KolamDesignPrinciples:
         symmetries['max_symmetry'] = max(all_symmetries)
         symmetries['symmetry_type'] = self._classify_symmetry_type(symmetries)
         
+        self._symmetry_cache = symmetries
         return symmetries
     
     def _classify_symmetry_type(self, symmetries: Dict) -> str:
@@ -353,6 +366,9 @@ class KolamDesignPrinciples:
         Returns:
             Dictionary containing connectivity analysis
         """
+        if self._connectivity_cache is not None:
+            return self._connectivity_cache
+        
         if not self.design_graph.nodes():
             self.extract_path_structure()
         
@@ -383,15 +399,13 @@ class KolamDesignPrinciples:
                 degree_counts[degree] = degree_counts.get(degree, 0) + 1
             connectivity["degree_distribution"] = degree_counts
             
-            # Find cycles
-            try:
-                cycles = list(nx.simple_cycles(graph.to_directed()))
-                connectivity["num_cycles"] = len(cycles)
-                connectivity["cycle_lengths"] = [len(cycle) for cycle in cycles[:10]]  # First 10 cycles
-            except:
-                connectivity["num_cycles"] = 0
-                connectivity["cycle_lengths"] = []
+            # Independent cycles from a cycle basis; enumerating every simple cycle
+            # of the skeleton is exponential and never finishes on real designs
+            cycles = nx.cycle_basis(graph)
+            connectivity["num_cycles"] = len(cycles)
+            connectivity["cycle_lengths"] = [len(cycle) for cycle in cycles[:10]]  # First 10 cycles
         
+        self._connectivity_cache = connectivity
         return connectivity
     
     def identify_geometric_patterns(self) -> Dict:
@@ -401,45 +415,48 @@ class KolamDesignPrinciples:
         Returns:
             Dictionary containing pattern analysis
         """
+        if self._patterns_cache is not None:
+            return self._patterns_cache
+        
         if self.binary_image is None:
             self.preprocess_image()
         
         patterns = {}
         
-        # Detect curves and lines
-        edges = cv2.Canny(self.binary_image, 50, 150)
-        
         # Hough Line Transform for straight lines
-        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=50, minLineLength=30, maxLineGap=10)
+        lines = cv2.HoughLinesP(self.edges, 1, np.pi/180, threshold=50, minLineLength=30, maxLineGap=10)
         patterns['num_straight_lines'] = len(lines) if lines is not None else 0
         
-        # Detect circles/arcs using Hough Circle Transform
+        # Detect circles/arcs using the edge-normal Hough variant on a smoothed
+        # grayscale; the classic accumulator on the binary image is far slower
+        # and reports hundreds of spurious circles on dense strokes.
+        smoothed = cv2.GaussianBlur(self.image, (7, 7), 1.5)
         circles = cv2.HoughCircles(
-            self.binary_image, cv2.HOUGH_GRADIENT, 1, 20,
-            param1=50, param2=30, minRadius=10, maxRadius=100
+            smoothed, cv2.HOUGH_GRADIENT_ALT, 1.5, 20,
+            param1=300, param2=0.85, minRadius=10, maxRadius=100
         )
         patterns['num_circles'] = len(circles[0]) if circles is not None else 0
         
         # Analyze contour properties for pattern detection
-        contours, _ = cv2.findContours(self.binary_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
         pattern_types = []
-        for contour in contours:
-            if cv2.contourArea(contour) > 100:  # Filter small contours
-                # Analyze contour properties
-                epsilon = 0.02 * cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, epsilon, True)
-                
-                if len(approx) <= 4:
-                    pattern_types.append("angular")
-                elif len(approx) <= 8:
-                    pattern_types.append("polygonal")
-                else:
-                    pattern_types.append("curved")
+        for i in np.flatnonzero(self.contour_areas > 100):  # Filter small contours
+            contour = self.contours[i]
+            
+            # Analyze contour properties
+            epsilon = 0.02 * cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, epsilon, True)
+            
+            if len(approx) <= 4:
+                pattern_types.append("angular")
+            elif len(approx) <= 8:
+                pattern_types.append("polygonal")
+            else:
+                pattern_types.append("curved")
         
         patterns['pattern_types'] = list(set(pattern_types))
         patterns['pattern_complexity'] = len(set(pattern_types))
         
+        self._patterns_cache = patterns
         return patterns
     
     def analyze_cultural_constraints(self) -> Dict:
@@ -468,7 +485,7 @@ class KolamDesignPrinciples:
         # Rule 3: Grid-based structure
         constraints['grid_based'] = bool(self.grid_structure and self.grid_structure.get('regularity_score', 0) > 0.7)
         
-        # Rule 4: Symmetrical design
+        # Rule 4: Symmetrical design (reuses the cached symmetry analysis)
         symmetry_analysis = self.analyze_symmetry_operations()
         constraints['has_symmetry'] = symmetry_analysis.get('max_symmetry', 0) > 0.6
         
@@ -503,11 +520,19 @@ class KolamDesignPrinciples:
         # Basic preprocessing
         self.preprocess_image()
         
-        # Analyze all aspects
-        analysis['grid_structure'] = self.detect_dot_grid()
-        analysis['path_connectivity'] = self.analyze_path_connectivity()
-        analysis['symmetry_operations'] = self.analyze_symmetry_operations()
-        analysis['geometric_patterns'] = self.identify_geometric_patterns()
+        # The first four analyses only read the binary image and write disjoint
+        # attributes, so they run concurrently; OpenCV and NumPy release the GIL.
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                'grid_structure': executor.submit(self.detect_dot_grid),
+                'path_connectivity': executor.submit(self.analyze_path_connectivity),
+                'symmetry_operations': executor.submit(self.analyze_symmetry_operations),
+                'geometric_patterns': executor.submit(self.identify_geometric_patterns),
+            }
+            for key, future in futures.items():
+                analysis[key] = future.result()
+        
+        # Cultural constraints depend on the grid structure and path graph above
         analysis['cultural_constraints'] = self.analyze_cultural_constraints()
         
         # Generate summary
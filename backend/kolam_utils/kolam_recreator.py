@@ -471,16 +471,17 @@ class KolamRecreator:
         if not self.dot_grid:
             return None
         
-        min_dist = float('inf')
+        # Compare squared distances; the sqrt is not needed to rank or threshold
+        min_dist_sq = float('inf')
         closest_dot = None
         
         for dot in self.dot_grid:
-            dist = math.sqrt((dot[0] - target[0])**2 + (dot[1] - target[1])**2)
-            if dist < min_dist:
-                min_dist = dist
+            dist_sq = (dot[0] - target[0])**2 + (dot[1] - target[1])**2
+            if dist_sq < min_dist_sq:
+                min_dist_sq = dist_sq
                 closest_dot = dot
         
-        return closest_dot if min_dist < 100 else None  # Threshold for valid match
+        return closest_dot if min_dist_sq < 100 * 100 else None  # Threshold for valid match
     
     def save_design(self, filename: str):
         """Save the generated design to a file."""
@@ -4,7 +4,7 @@ from torch.optim import AdamW
 import torch.nn as nn
 
 # Placeholder for actual models
-from .models import DotGridDetector, StrokeSegmenter
+from .models import KolamMultiHead
 
 class KolamDataset(Dataset):
     """Custom dataset for loading Kolam images and their masks."""
@@ -21,8 +21,8 @@ class KolamDataset(Dataset):
         # In a real implementation, you would load images and masks from paths
         # For now, we'll just return random tensors as placeholders
         image = torch.randn(3, 256, 256)
-        stroke_mask = torch.randn(1, 256, 256)
-        dot_grid = torch.randn(1, 256, 256)
+        stroke_mask = torch.rand(1, 256, 256)
+        dot_grid = torch.rand(1, 256, 256)
 
         # Apply transformations if any
         if self.transform:
@@ -41,55 +41,50 @@ def dice_loss(pred, target, smooth = 1.):
 
 def fine_tune_models():
     """Main function to run the fine-tuning process."""
-    # 1. Initialize models
-    dot_detector = DotGridDetector(pretrained=True)
-    stroke_segmenter = StrokeSegmenter(pretrained=True)
+    # 1. Initialize the model served by the API: both heads share one backbone
+    model = KolamMultiHead(pretrained=True)
 
     # 2. Create placeholder dataset and dataloader
     # In a real scenario, these paths would point to your actual dataset
     dataset = KolamDataset(['path1'], ['path1'], ['path1'])
     dataloader = DataLoader(dataset, batch_size=4, shuffle=True)
 
-    # 3. Define optimizers and loss functions
-    optimizer_dots = AdamW(dot_detector.parameters(), lr=1e-4)
-    optimizer_strokes = AdamW(stroke_segmenter.parameters(), lr=1e-4)
+    # 3. Define the optimizer and loss functions
+    optimizer = AdamW(model.parameters(), lr=1e-4)
     
-    # Binary Cross-Entropy for dot detection (pixel-wise classification)
-    loss_fn_dots = nn.BCEWithLogitsLoss()
+    # Binary Cross-Entropy for dot detection (pixel-wise classification); the dot
+    # head already ends in a sigmoid, so the plain (non-logit) form applies
+    loss_fn_dots = nn.BCELoss()
     # Dice Loss for segmentation (better for imbalanced masks)
     loss_fn_strokes = dice_loss
 
     # 4. Training loop
     num_epochs = 10 # Example number of epochs
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    dot_detector.to(device)
-    stroke_segmenter.to(device)
+    model.to(device)
 
     print("Starting fine-tuning process (simulation)....")
     for epoch in range(num_epochs):
         for images, stroke_masks, dot_grids in dataloader:
             images, stroke_masks, dot_grids = images.to(device), stroke_masks.to(device), dot_grids.to(device)
 
-            # --- Train Dot Detector ---
-            optimizer_dots.zero_grad()
-            dot_preds = dot_detector(images)
-            loss_d = loss_fn_dots(dot_preds, dot_grids)
-            loss_d.backward()
-            optimizer_dots.step()
-
-            # --- Train Stroke Segmenter ---
-            optimizer_strokes.zero_grad()
-            stroke_preds = stroke_segmenter(images)['out']
+            # One forward pass trains both heads and the shared backbone
+            optimizer.zero_grad()
+            dot_preds, stroke_preds = model(images)
+            # The dot map comes out at backbone resolution; max-pool the target
+            # down to it so no dot is lost
+            dot_targets = nn.functional.adaptive_max_pool2d(dot_grids, dot_preds.shape[-2:])
+            loss_d = loss_fn_dots(dot_preds, dot_targets)
             loss_s = loss_fn_strokes(stroke_preds, stroke_masks)
-            loss_s.backward()
-            optimizer_strokes.step()
+            (loss_d + loss_s).backward()
+            optimizer.step()
 
         print(f"Epoch {epoch+1}/{num_epochs}, Dot Loss: {loss_d.item():.4f}, Stroke Loss: {loss_s.item():.4f}")
 
     print("Fine-tuning simulation complete.")
-    # In a real implementation, you would save the fine-tuned model weights
-    # torch.save(dot_detector.state_dict(), 'dot_detector_finetuned.pth')
-    # torch.save(stroke_segmenter.state_dict(), 'stroke_segmenter_finetuned.pth')
+    # In a real implementation, you would save the fine-tuned model weights,
+    # which load directly into the KolamMultiHead used by image_processing
+    # torch.save(model.state_dict(), 'kolam_multihead_finetuned.pth')
 
 if __name__ == '__main__':
     # This allows running the training script directly